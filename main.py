@@ -1,3 +1,7 @@
+import ctypes
+import hashlib
+import io
+import json
 import os
 import sys
 import subprocess
@@ -5,9 +9,19 @@ import threading
 import time
 import tempfile
 import shutil
+import socket
+import struct
 import requests
 import zipfile
+import zlib
 import platform
+import posixpath
+import queue
+import plistlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QListWidget, QTextEdit, QProgressBar,
@@ -15,8 +29,10 @@ from PyQt5.QtWidgets import (
     QTreeWidgetItem, QInputDialog, QLineEdit, QComboBox, QCheckBox,
     QDialog, QProgressDialog
 )
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject, QSize
-from PyQt5.QtGui import QIcon, QColor, QFont, QPixmap
+from PyQt5.QtCore import (
+    QTimer, Qt, pyqtSignal, QObject, QSize, QThread, QThreadPool, QRunnable
+)
+from PyQt5.QtGui import QIcon, QColor, QFont, QPixmap, QTextCursor, QTextCharFormat
 
 # ====================== CONSTANTS ======================
 APP_NAME = "iDevice Manager for Windows"
@@ -31,10 +47,227 @@ TOOL_URLS = {
     'idevicediagnostics.exe': 'https://github.com/libimobiledevice/idevicediagnostics/releases/download/1.0.0/idevicediagnostics-windows.zip',
     'idevicescreenshot.exe': 'https://github.com/libimobiledevice/idevicescreenshot/releases/download/1.0.0/idevicescreenshot-windows.zip'
 }
+LIBIMOBILEDEVICE_DLL = 'imobiledevice.dll'
+LIBPLIST_DLL = 'plist.dll'
+MAX_DOWNLOAD_WORKERS = 8
+WRITE_QUEUE_SIZE = 16
+MANIFEST_PATH = os.path.join(WINDOWS_BIN_DIR, 'tools_manifest.json')
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = (5, 60)  # connect, read (seconds)
+DEVICE_POLL_INTERVAL = 3000  # ms, only used when usbmuxd is unreachable
+MAX_DEVICE_POLL_INTERVAL = 30000  # ms, while no device is connected
+BATTERY_REFRESH_INTERVAL = 60000  # ms, while a device is connected
+ATTACH_RETRIES = 4
+ATTACH_RETRY_DELAY = 1000  # ms, doubled after each retry
+USBMUXD_ADDRESS = ('127.0.0.1', 27015)
+LOG_FLUSH_INTERVAL = 50  # ms
+LOG_MAX_BLOCKS = 2000
+LOG_COLORS = {
+    "info": "#63b3ed",
+    "success": "#68d391",
+    "warning": "#faf089",
+    "error": "#fc8181"
+}
+LOG_TIMESTAMP_COLOR = "#718096"
+APP_STYLESHEET = """
+    QWidget#sidebar {
+        background-color: #2c3e50;
+        color: white;
+    }
+    #sidebar QLabel {
+        color: white;
+        padding: 10px;
+    }
+    QLabel#logo {
+        font-size: 18px;
+        font-weight: bold;
+        padding: 20px;
+        qproperty-alignment: AlignCenter;
+    }
+    QLabel#versionLabel {
+        font-size: 12px;
+        qproperty-alignment: AlignCenter;
+        padding-bottom: 20px;
+    }
+    QLabel#deviceStatus {
+        font-size: 14px;
+        padding-bottom: 20px;
+    }
+    QPushButton#navBtn {
+        text-align: left;
+        padding: 12px;
+        border: none;
+        color: white;
+        font-size: 14px;
+    }
+    QPushButton#navBtn:hover {
+        background-color: #3498db;
+    }
+    QLabel#deviceName {
+        font-weight: bold;
+    }
+    QTextEdit#logOutput {
+        background-color: #1a202c;
+        color: #cbd5e0;
+        font-family: Consolas;
+        font-size: 12px;
+        border: 1px solid #2d3748;
+    }
+"""
+
+# ====================== REMOTE ZIP ======================
+class RangeNotSupportedError(Exception):
+    """Raised when a server cannot serve byte ranges of a file"""
+
+class RemoteZip(io.RawIOBase):
+    """Seekable, read-only view of a remote zip archive over HTTP Range requests"""
+
+    # End of central directory record with the longest possible comment,
+    # plus the ZIP64 locator and end record that may precede it
+    TAIL_SIZE = 65557 + 76
+    LOCAL_HEADER_SIZE = 30
+    # Room for a local extra field that is larger than the central one
+    LOCAL_HEADER_SLACK = 1024
+
+    def __init__(self, url, session=None, progress=None):
+        super().__init__()
+        self.url = url
+        self.session = session or requests.Session()
+        # Called with (bytes received, bytes expected) as ranges are fetched
+        self._progress = progress or (lambda done, total: None)
+        self._pos = 0
+
+        # Fetch the tail once; zipfile reads the central directory from it
+        response = self._request(f"-{self.TAIL_SIZE}", stream=True)
+        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+        if (response.status_code != 206 or not total.isdigit()
+                or response.headers.get('Accept-Ranges') == 'none'):
+            response.close()
+            raise RangeNotSupportedError(url)
+
+        self.size = int(total)
+        self._tail = response.content
+        self._progress(len(self._tail), len(self._tail))
+        self._tail_offset = self.size - len(self._tail)
+        self.zip = zipfile.ZipFile(self)
+
+    def _request(self, byte_range, stream=False):
+        """Issue a GET for a byte range of the archive"""
+        # Ranges must apply to the raw bytes, not a compressed encoding
+        response = self.session.get(
+            self.url,
+            headers={'Range': f'bytes={byte_range}', 'Accept-Encoding': 'identity'},
+            stream=stream,
+            timeout=DOWNLOAD_TIMEOUT
+        )
+        response.raise_for_status()
+        return response
+
+    def _read_at(self, start, end):
+        """Read archive bytes [start, end), serving the tail from cache"""
+        if start >= end:
+            return b''
+        if start >= self._tail_offset:
+            return self._tail[start - self._tail_offset:end - self._tail_offset]
+
+        self._progress(0, end - start)
+        data = self._request(f"{start}-{end - 1}").content
+        self._progress(len(data), 0)
+        return data
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self._pos
+
+    def read(self, size=-1):
+        end = self.size if size is None or size < 0 else min(self._pos + size, self.size)
+        data = self._read_at(self._pos, end)
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def read_member(self, info):
+        """Fetch and decompress a single member with one ranged request"""
+        if info.flag_bits & 0x1 or info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            # Leave encryption and other codecs to zipfile
+            return self.zip.read(info)
+
+        # The local header repeats the name and may carry its own extra
+        # field, so over-fetch a little and locate the data from it
+        start = info.header_offset
+        end = min(
+            self.size,
+            start + self.LOCAL_HEADER_SIZE + len(info.orig_filename.encode('utf-8'))
+            + len(info.extra) + info.compress_size + self.LOCAL_HEADER_SLACK
+        )
+        data = self._read_at(start, end)
+        if data[:4] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad local file header for {info.filename}")
+
+        name_len, extra_len = struct.unpack('<HH', data[26:30])
+        data_start = self.LOCAL_HEADER_SIZE + name_len + extra_len
+        payload = data[data_start:data_start + info.compress_size]
+        if len(payload) < info.compress_size:
+            payload += self._read_at(
+                start + data_start + len(payload),
+                start + data_start + info.compress_size
+            )
+
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            payload = decompressor.decompress(payload) + decompressor.flush()
+
+        if zlib.crc32(payload) != info.CRC:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for {info.filename}")
+        return payload
 
 # ====================== DEPENDENCY MANAGER ======================
+class InstallCancelledError(Exception):
+    """Raised when the user cancels the tool installation"""
+
+class DependencySignals(QObject):
+    progress_signal = pyqtSignal(int, int)
+    error_signal = pyqtSignal(str)
+
 class DependencyManager:
-    def __init__(self):
+    def __init__(self, signals=None, cancel_event=None):
+        self.signals = signals or DependencySignals()
+        # Set from the GUI thread to stop downloads between chunks
+        self.cancel_event = cancel_event or threading.Event()
+        self._bytes_done = 0
+        self._bytes_total = 0
+        self._progress_lock = threading.Lock()
+        # Archive rank of each file written this run, see _claim
+        self._written = {}
+
+        # One pooled session so parallel and ranged downloads reuse connections
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=MAX_DOWNLOAD_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        ))
+
         self.ensure_bin_directory()
         self.check_dependencies()
 
@@ -44,53 +277,449 @@ class DependencyManager:
             os.makedirs(WINDOWS_BIN_DIR)
 
     def check_dependencies(self):
-        """Check if all required tools are available"""
-        missing_tools = []
-        for tool in TOOL_URLS.keys():
-            tool_path = os.path.join(WINDOWS_BIN_DIR, tool)
-            if not os.path.exists(tool_path):
-                missing_tools.append(tool)
+        """Check if all required tools are available and intact"""
+        manifest = self._load_manifest()
+        digests = self._hash_tools(TOOL_URLS)
+
+        # Downloads only appear once complete, so a present tool that was
+        # never recorded was installed by hand and is taken as it is
+        unrecorded = [
+            tool for tool, digest in digests.items()
+            if digest and tool not in manifest
+        ]
+        for tool in unrecorded:
+            manifest[tool] = digests[tool]
+
+        # Tools that are absent or changed since they were recorded are missing
+        missing_tools = [
+            tool for tool, digest in digests.items()
+            if digest is None or digest != manifest[tool]
+        ]
 
+        installed = []
         if missing_tools:
-            self.download_tools(missing_tools)
+            failed = self.download_tools(missing_tools)
+            installed = [tool for tool in missing_tools if tool not in failed]
+            for tool, digest in self._hash_tools(installed).items():
+                if digest:
+                    manifest[tool] = digest
+
+        if unrecorded or installed:
+            self._save_manifest(manifest)
+
+    def _hash_tools(self, tools):
+        """Hash installed tools concurrently"""
+        tools = list(tools)
+        if not tools:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+            return dict(zip(tools, executor.map(self._hash_tool, tools)))
+
+    def _hash_tool(self, tool):
+        """Return the SHA-256 of an installed tool, or None if it is absent"""
+        try:
+            with open(self.get_tool_path(tool), 'rb') as f:
+                if hasattr(hashlib, 'file_digest'):
+                    return hashlib.file_digest(f, 'sha256').hexdigest()
+
+                digest = hashlib.sha256()
+                for chunk in iter(partial(f.read, DOWNLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                return digest.hexdigest()
+        except OSError:
+            return None
+
+    def _load_manifest(self):
+        """Load the hashes recorded when tools were installed"""
+        try:
+            with open(MANIFEST_PATH, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest):
+        """Record the hashes of installed tools"""
+        try:
+            with open(MANIFEST_PATH, 'w') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+        except OSError:
+            # Unrecorded tools are just downloaded again on the next start
+            pass
 
     def download_tools(self, tools):
-        """Download and extract required tools"""
+        """Download and extract required tools, returning those that failed"""
+        # Several tools ship in the same archive, so fetch each URL only once
+        urls = {}
         for tool in tools:
-            try:
-                self.download_and_extract_tool(tool)
-            except Exception as e:
-                QMessageBox.critical(
-                    None, "Dependency Error",
-                    f"Failed to install {tool}:\n{str(e)}\n\n"
-                    f"Please download manually from:\n{TOOL_URLS[tool]}"
-                )
+            urls.setdefault(TOOL_URLS[tool], []).append(tool)
+        self._written.clear()
+
+        # Downloads run in parallel while a single writer thread does the
+        # disk work, so network and extraction overlap without contending
+        writes = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        failures = {}
+        writer = threading.Thread(
+            target=self._run_writer,
+            args=(writes, failures),
+            daemon=True
+        )
+        writer.start()
+
+        # Wanted tools that an archive turned out not to contain, by URL
+        absent = {}
+        with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(urls))) as executor:
+            futures = {
+                executor.submit(
+                    self._fetch_url, url, set(targets), partial(self._queue_write, writes, url)
+                ): url
+                for url, targets in urls.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    absent[futures[future]] = future.result()
+                except Exception as e:
+                    failures.setdefault(futures[future], e)
+
+        writes.put(None)
+        writer.join()
+
+        # Downloads stopped by a cancel are not failures to report
+        if self.cancel_event.is_set():
+            raise InstallCancelledError()
+
+        failed = {}
+        for url, targets in urls.items():
+            for tool in targets:
+                if url in failures:
+                    failed[tool] = (url, str(failures[url]))
+                elif tool in absent.get(url, ()):
+                    failed[tool] = (url, f"{tool} was not found in the archive")
+
+        for tool, (url, reason) in failed.items():
+            self.signals.error_signal.emit(
+                f"Failed to install {tool}:\n{reason}\n\n"
+                f"Please download manually from:\n{url}"
+            )
+
+        return set(failed)
 
     def download_and_extract_tool(self, tool_name):
         """Download and extract a single tool"""
         url = TOOL_URLS[tool_name]
-        zip_name = os.path.basename(url)
-        zip_path = os.path.join(WINDOWS_BIN_DIR, zip_name)
+        if self._fetch_url(url, {tool_name}, lambda job: job()):
+            raise FileNotFoundError(f"{tool_name} was not found in {url}")
+
+    @staticmethod
+    def _queue_write(writes, url, job):
+        """Hand a disk write for an archive to the writer thread"""
+        writes.put((url, job))
+
+    @staticmethod
+    def _run_writer(writes, failures):
+        """Run queued disk writes one at a time until told to stop"""
+        while True:
+            item = writes.get()
+            if item is None:
+                return
+
+            url, job = item
+            try:
+                job()
+            except Exception as e:
+                failures.setdefault(url, e)
+
+    def _fetch_url(self, url, wanted, write):
+        """Download the wanted tools from a remote archive, passing disk work to write
+
+        Returns the wanted tools that the archive does not contain.
+        """
+        self._check_cancelled()
+        rank = self._url_rank(url)
+        try:
+            remote = RemoteZip(url, self.session, self._track_progress)
+        except RangeNotSupportedError:
+            zip_ref = zipfile.ZipFile(self._download_archive(url), 'r')
+            members = self._select_members(zip_ref.infolist(), wanted)
+            write(partial(self._extract_archive, zip_ref, members, rank))
+        else:
+            with remote:
+                members = self._select_members(remote.zip.infolist(), wanted)
+                for info in members:
+                    self._check_cancelled()
+                    content = remote.read_member(info)
+                    write(partial(self._write_file, posixpath.basename(info.filename), content, rank))
 
-        # Download the tool
-        response = requests.get(url, stream=True)
+        return wanted - {posixpath.basename(info.filename) for info in members}
+
+    @staticmethod
+    def _url_rank(url):
+        """Priority of an archive when several ship a file of the same name"""
+        return list(dict.fromkeys(TOOL_URLS.values())).index(url)
+
+    @staticmethod
+    def _select_members(infos, wanted):
+        """Pick the wanted tools and the DLLs in the same folder as them"""
+        # Only the first copy of each tool is used, so per-architecture
+        # folders cannot collapse onto one file
+        tools = {}
+        for info in infos:
+            name = posixpath.basename(info.filename)
+            if not info.is_dir() and name in wanted:
+                tools.setdefault(name, info)
+
+        tool_dirs = {posixpath.dirname(info.filename) for info in tools.values()}
+        libraries = [
+            info for info in infos
+            if not info.is_dir()
+            and info.filename.lower().endswith('.dll')
+            and posixpath.dirname(info.filename) in tool_dirs
+        ]
+        return list(tools.values()) + libraries
+
+    def _claim(self, name, rank):
+        """Whether an archive of this rank may write name into the binary directory"""
+        # Downloads finish in any order, so a shared DLL goes to the archive
+        # listed first in TOOL_URLS rather than to whichever lands last
+        previous = self._written.get(name)
+        if previous is not None and previous <= rank:
+            return False
+        self._written[name] = rank
+        return True
+
+    def _write_file(self, name, content, rank):
+        """Write an extracted file into the binary directory"""
+        if not self._claim(name, rank):
+            return
+        self._replace_file(name, lambda f: f.write(content))
+
+    @staticmethod
+    def _replace_file(name, write):
+        """Write a file into the binary directory so that it only appears once complete"""
+        dest = os.path.join(WINDOWS_BIN_DIR, name)
+        part = dest + '.part'
+        with open(part, 'wb') as f:
+            write(f)
+        os.replace(part, dest)
+
+    def _download_archive(self, url):
+        """Download a whole archive into memory"""
+        response = self.session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT)
         response.raise_for_status()
+        self._track_progress(0, int(response.headers.get('Content-Length', 0)))
+
+        # Tool archives are small enough to extract straight from memory
+        buf = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            self._check_cancelled()
+            buf.write(chunk)
+            self._track_progress(len(chunk), 0)
+        buf.seek(0)
+        return buf
 
-        with open(zip_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+    def _check_cancelled(self):
+        """Stop the current download if the installation was cancelled"""
+        if self.cancel_event.is_set():
+            raise InstallCancelledError()
 
-        # Extract the tool
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(WINDOWS_BIN_DIR)
+    def _track_progress(self, done, total):
+        """Add to the download byte counters and report them"""
+        with self._progress_lock:
+            self._bytes_done += done
+            self._bytes_total += total
+            self.signals.progress_signal.emit(self._bytes_done, self._bytes_total)
 
-        # Clean up
-        os.remove(zip_path)
+    def _extract_archive(self, zip_ref, members, rank):
+        """Extract members of a downloaded archive into the binary directory"""
+        with zip_ref:
+            for info in members:
+                name = posixpath.basename(info.filename)
+                if not self._claim(name, rank):
+                    continue
+
+                with zip_ref.open(info) as src:
+                    self._replace_file(
+                        name, lambda dst: shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
+                    )
 
     def get_tool_path(self, tool_name):
         """Get full path to a tool"""
         return os.path.join(WINDOWS_BIN_DIR, tool_name)
 
+# ====================== BACKGROUND TASKS ======================
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    log_signal = pyqtSignal(str, str)
+
+class Task(QRunnable):
+    """Run a callable on a QThreadPool and report its result"""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+
+    def run(self):
+        result = None
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            # An exception escaping a QRunnable would abort the application
+            self.signals.log_signal.emit(f"{self.fn.__name__} failed: {str(e)}", "error")
+        # Queued to the receivers' thread, normally the GUI thread
+        self.signals.finished.emit(result)
+
+class DependencyLoader(QThread):
+    """Check and install dependencies off the GUI thread"""
+    dep_ready = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Created here so the GUI can connect before any download starts
+        self.signals = DependencySignals()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Ask the installation to stop at its next chunk or request"""
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            dep_manager = DependencyManager(self.signals, self.cancel_event)
+        except InstallCancelledError:
+            return
+        except Exception as e:
+            # An exception escaping run() would abort the application; the
+            # usual cause is a non-admin user unable to write to ProgramFiles
+            self.signals.error_signal.emit(
+                f"Failed to set up required tools in {WINDOWS_BIN_DIR}:\n{str(e)}"
+            )
+            return
+        self.dep_ready.emit(dep_manager)
+
+# ====================== LIBIMOBILEDEVICE ======================
+class LibIMobileDevice:
+    """Direct ctypes bindings to libimobiledevice, avoiding a process per query"""
+
+    def __init__(self, bin_dir):
+        # Let the DLLs resolve their own dependencies from the same directory
+        if hasattr(os, 'add_dll_directory'):
+            self._dll_dir = os.add_dll_directory(bin_dir)
+        self.lib = ctypes.CDLL(os.path.join(bin_dir, LIBIMOBILEDEVICE_DLL))
+        self.plist = ctypes.CDLL(os.path.join(bin_dir, LIBPLIST_DLL))
+
+        lib = self.lib
+        lib.idevice_get_device_list.argtypes = [
+            ctypes.POINTER(ctypes.POINTER(ctypes.c_char_p)), ctypes.POINTER(ctypes.c_int)
+        ]
+        lib.idevice_get_device_list.restype = ctypes.c_int
+        lib.idevice_device_list_free.argtypes = [ctypes.POINTER(ctypes.c_char_p)]
+        lib.idevice_new.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_char_p]
+        lib.idevice_new.restype = ctypes.c_int
+        lib.idevice_free.argtypes = [ctypes.c_void_p]
+        lib.lockdownd_client_new_with_handshake.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p), ctypes.c_char_p
+        ]
+        lib.lockdownd_client_new_with_handshake.restype = ctypes.c_int
+        lib.lockdownd_get_value.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_void_p)
+        ]
+        lib.lockdownd_get_value.restype = ctypes.c_int
+        lib.lockdownd_client_free.argtypes = [ctypes.c_void_p]
+
+        plist = self.plist
+        plist.plist_to_xml.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_uint32)
+        ]
+        plist.plist_free.argtypes = [ctypes.c_void_p]
+        self._xml_free = self._find_xml_free(os.path.join(bin_dir, LIBPLIST_DLL))
+        self._xml_free.argtypes = [ctypes.c_void_p]
+
+    def _find_xml_free(self, plist_path):
+        """Find the function that frees the buffer returned by plist_to_xml"""
+        # libplist 2.3+ exports plist_to_xml_free, some older builds plist_mem_free
+        for name in ('plist_to_xml_free', 'plist_mem_free'):
+            free = getattr(self.plist, name, None)
+            if free:
+                return free
+
+        # Older builds allocate with the C runtime they import, so free through it
+        with open(plist_path, 'rb') as f:
+            image = f.read().lower()
+        crts = set()
+        if b'msvcrt.dll' in image:
+            crts.add('msvcrt')
+        if b'ucrtbase.dll' in image or b'api-ms-win-crt-heap' in image:
+            crts.add('ucrtbase')
+        if len(crts) == 1:
+            return getattr(ctypes.cdll, crts.pop()).free
+
+        # A static or unknown runtime can't be freed from here; use the tools instead
+        raise OSError(f"No way to free plist_to_xml buffers from {LIBPLIST_DLL}")
+
+    @classmethod
+    def load(cls, bin_dir):
+        """Load the bindings, or return None if the DLLs are unusable"""
+        try:
+            return cls(bin_dir)
+        except (OSError, AttributeError):
+            return None
+
+    def list_devices(self):
+        """Return the UDIDs of connected devices"""
+        devices = ctypes.POINTER(ctypes.c_char_p)()
+        count = ctypes.c_int()
+        if self.lib.idevice_get_device_list(ctypes.byref(devices), ctypes.byref(count)) != 0:
+            return []
+
+        try:
+            return [devices[i].decode() for i in range(count.value)]
+        finally:
+            self.lib.idevice_device_list_free(devices)
+
+    def get_value(self, udid, domain=None, key=None):
+        """Read a lockdown value of a device as native Python objects"""
+        device = ctypes.c_void_p()
+        if self.lib.idevice_new(ctypes.byref(device), udid.encode()) != 0:
+            return None
+
+        try:
+            client = ctypes.c_void_p()
+            if self.lib.lockdownd_client_new_with_handshake(
+                    device, ctypes.byref(client), APP_NAME.encode()) != 0:
+                return None
+
+            try:
+                node = ctypes.c_void_p()
+                if self.lib.lockdownd_get_value(
+                        client,
+                        domain.encode() if domain else None,
+                        key.encode() if key else None,
+                        ctypes.byref(node)) != 0:
+                    return None
+
+                try:
+                    return self._to_python(node)
+                finally:
+                    self.plist.plist_free(node)
+            finally:
+                self.lib.lockdownd_client_free(client)
+        finally:
+            self.lib.idevice_free(device)
+
+    def _to_python(self, node):
+        """Convert a plist_t to Python objects through its XML form"""
+        xml = ctypes.c_void_p()
+        length = ctypes.c_uint32()
+        self.plist.plist_to_xml(node, ctypes.byref(xml), ctypes.byref(length))
+        if not xml.value:
+            return None
+
+        try:
+            return plistlib.loads(ctypes.string_at(xml, length.value))
+        finally:
+            self._xml_free(xml)
+
 # ====================== DEVICE MANAGER ======================
 class DeviceSignals(QObject):
     log_signal = pyqtSignal(str, str)
@@ -104,9 +733,17 @@ class DeviceManager:
         self.udid = None
         self.device_info = {}
         self.mount_point = "Z:\\"
+        self._mounted = False
         self.operation_lock = threading.Lock()
+        # Kept until a usbmuxd event or a failed query invalidates it
+        self._cached_udid = None
+        self._info_cache = {}
+        self._last_info_hash = {}
 
-    def run_command(self, command, args=None, timeout=30):
+        # Query lockdown in-process when possible, else fall back to the tools
+        self.lib = LibIMobileDevice.load(WINDOWS_BIN_DIR)
+
+    def run_command(self, command, args=None, timeout=30, text=True):
         """Run a command with proper error handling"""
         if args is None:
             args = []
@@ -120,7 +757,7 @@ class DeviceManager:
             result = subprocess.run(
                 [cmd_path] + args,
                 capture_output=True,
-                text=True,
+                text=text,
                 timeout=timeout,
                 creationflags=subprocess.CREATE_NO_WINDOW
             )
@@ -135,24 +772,42 @@ class DeviceManager:
     def check_connection(self):
         """Check if device is connected and get info"""
         with self.operation_lock:
-            # Get UDID first
-            result = self.run_command("idevice_id.exe", ["-l"])
-            if not result or not result.stdout.strip():
-                self.signals.device_update_signal.emit({})
-                return False
+            # Get UDID first, reusing it while the device stays attached
+            if self._cached_udid:
+                self.udid = self._cached_udid
+            else:
+                udids = self.list_devices()
+                if not udids:
+                    self._emit_disconnected()
+                    return False
+
+                self.udid = udids[0]
+                self._cached_udid = self.udid
 
-            self.udid = result.stdout.strip().split('\n')[0]
+            # Static info never changes for a device, so fetch it once
+            device_info = self._info_cache.get(self.udid)
+            if device_info is None:
+                device_info = self.query_info()
+                if device_info is None:
+                    self._emit_disconnected()
+                    return False
+                self._info_cache[self.udid] = device_info
 
-            # Get detailed info
-            info_result = self.run_command("ideviceinfo.exe", ["-u", self.udid])
-            if info_result and info_result.returncode == 0:
-                device_info = {}
-                for line in info_result.stdout.splitlines():
-                    if ":" in line:
-                        key, val = line.split(":", 1)
-                        device_info[key.strip()] = val.strip()
+            device_info = dict(device_info)
 
-                # Get battery info if available
+            # Get battery info if available
+            battery = self.query_info("com.apple.mobile.battery")
+            if battery is None:
+                # The device may be gone; confirm it is still listed before
+                # keeping the cached UDID
+                if self.udid not in self.list_devices():
+                    self._emit_disconnected()
+                    return False
+                battery = {}
+
+            if "BatteryCurrentCapacity" in battery:
+                device_info["BatteryLevel"] = battery["BatteryCurrentCapacity"]
+            else:
                 battery_result = self.run_command(
                     "idevicediagnostics.exe",
                     ["ioregentry", "AppleSmartBattery"]
@@ -162,11 +817,53 @@ class DeviceManager:
                         if "CurrentCapacity" in line:
                             device_info["BatteryLevel"] = line.split("=")[1].strip()
 
+            # Only update the UI when something actually changed
+            info_hash = hash(repr(sorted(device_info.items())))
+            if info_hash != self._last_info_hash.get(self.udid):
+                self._last_info_hash[self.udid] = info_hash
                 self.signals.device_update_signal.emit(device_info)
-                return True
+            return True
 
-            self.signals.device_update_signal.emit({})
-            return False
+    def list_devices(self):
+        """Return the UDIDs of connected devices"""
+        if self.lib:
+            return self.lib.list_devices()
+
+        result = self.run_command("idevice_id.exe", ["-l"])
+        if not result:
+            return []
+        return result.stdout.split()
+
+    def query_info(self, domain=None):
+        """Read a lockdown domain of the current device as a dict"""
+        if self.lib:
+            return self.lib.get_value(self.udid, domain)
+
+        args = ["-u", self.udid, "-x"]
+        if domain:
+            args += ["-q", domain]
+
+        # Raw bytes: the plist is UTF-8, not the console code page
+        result = self.run_command("ideviceinfo.exe", args, text=False)
+        if not result or result.returncode != 0:
+            return None
+
+        try:
+            return plistlib.loads(result.stdout)
+        except Exception as e:
+            self.signals.log_signal.emit(f"Invalid device info: {str(e)}", "error")
+            return None
+
+    def invalidate_cache(self):
+        """Forget cached UDID and device info"""
+        self._cached_udid = None
+        self._info_cache.clear()
+        self._last_info_hash.clear()
+
+    def _emit_disconnected(self):
+        """Drop cached device state and report that no device is connected"""
+        self.invalidate_cache()
+        self.signals.device_update_signal.emit({})
 
     def mount_device(self):
         """Mount device filesystem"""
@@ -175,21 +872,114 @@ class DeviceManager:
                 return False
 
             # Unmount first if already mounted
-            self.unmount_device()
+            if self._mounted:
+                self.unmount_device()
 
             result = self.run_command(
                 "ifuse.exe",
                 [self.mount_point, "--udid", self.udid]
             )
-            return result.returncode == 0 if result else False
+            self._mounted = result.returncode == 0 if result else False
+            return self._mounted
 
     def unmount_device(self):
         """Unmount device filesystem"""
         result = self.run_command("fusermount.exe", ["-u", self.mount_point])
-        return result.returncode == 0 if result else False
+        ok = result.returncode == 0 if result else False
+        if ok:
+            self._mounted = False
+        return ok
+
+    @property
+    def mounted(self):
+        """Whether the device filesystem is currently mounted"""
+        return self._mounted
+
+# ====================== USBMUXD LISTENER ======================
+class UsbmuxListener(QThread):
+    """Subscribe to usbmuxd attach, detach and pairing notifications"""
+    device_event = pyqtSignal(str)
+    unavailable = pyqtSignal()
+
+    # length, version, message type, tag
+    HEADER = struct.Struct('<IIII')
+    PLIST_VERSION = 1
+    PLIST_MESSAGE = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._sock = None
+
+    def run(self):
+        try:
+            self._sock = socket.create_connection(USBMUXD_ADDRESS, timeout=2)
+            self._sock.settimeout(None)
+            self._send({
+                'MessageType': 'Listen',
+                'ClientVersionString': f"{APP_NAME} {VERSION}",
+                'ProgName': APP_NAME
+            })
+
+            reply = self._recv()
+            if reply.get('MessageType') != 'Result' or reply.get('Number') != 0:
+                raise ConnectionError(f"Listen rejected: {reply}")
+
+            while not self.isInterruptionRequested():
+                message = self._recv()
+                if message.get('MessageType') in ('Attached', 'Detached', 'Paired'):
+                    self.device_event.emit(message['MessageType'])
+        except Exception:
+            if not self.isInterruptionRequested():
+                self.unavailable.emit()
+        finally:
+            if self._sock:
+                self._sock.close()
+
+    def stop(self):
+        """Close the subscription and wait for the thread to exit"""
+        self.requestInterruption()
+        if self._sock:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.wait()
+
+    def _send(self, message):
+        payload = plistlib.dumps(message)
+        header = self.HEADER.pack(
+            self.HEADER.size + len(payload), self.PLIST_VERSION, self.PLIST_MESSAGE, 0
+        )
+        self._sock.sendall(header + payload)
+
+    def _recv(self):
+        length = self.HEADER.unpack(self._recv_exact(self.HEADER.size))[0]
+        return plistlib.loads(self._recv_exact(length - self.HEADER.size))
+
+    def _recv_exact(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self._sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("usbmuxd closed the connection")
+            data += chunk
+        return data
 
 # ====================== MAIN APPLICATION ======================
 class iDeviceManager(QMainWindow):
+    # Sidebar entries: (label, theme icon name, handler method name)
+    _NAV = (
+        ("Dashboard", "home", "show_dashboard"),
+        ("Flash & JB", "bolt", "show_flash_jb"),
+        ("Apps", "th-large", "show_apps"),
+        ("Files", "folder", "show_files"),
+        ("Backup", "save", "show_backup"),
+        ("Toolbox", "wrench", "show_toolbox"),
+        ("Settings", "cog", "show_settings")
+    )
+    # Shared by all windows; filled on first use since QIcon needs a QApplication
+    _icon_cache = {}
+
     def __init__(self):
         super().__init__()
         
@@ -201,17 +991,96 @@ class iDeviceManager(QMainWindow):
             )
             sys.exit(1)
 
-        # Initialize dependencies
-        self.dep_manager = DependencyManager()
-        self.device_mgr = DeviceManager(self.dep_manager)
+        # Dependencies are checked in the background once the UI is up
+        self.dep_manager = None
+        self.device_mgr = None
+        self.dep_progress = None
+        self.thread_pool = QThreadPool.globalInstance()
+        self._refresh_running = False
+        self._refresh_pending = False
         
         # Setup UI
         self.setup_ui()
-        self.setup_signals()
+        self.set_controls_enabled(False)
         
+        # Initialize dependencies
+        self.start_dependency_check()
+
+    def start_dependency_check(self):
+        """Check and install dependencies on a worker thread"""
+        self.device_status.setText("Checking dependencies...")
+
+        self.dep_loader = DependencyLoader(self)
+        self.dep_loader.signals.progress_signal.connect(self.update_dependency_progress)
+        self.dep_loader.signals.error_signal.connect(self.show_dependency_error)
+        self.dep_loader.dep_ready.connect(self.on_dependencies_ready)
+        self.dep_loader.finished.connect(self.on_dependency_check_finished)
+        self.dep_loader.start()
+
+    def update_dependency_progress(self, done, total):
+        """Show download progress while tools are being installed"""
+        # Downloads in flight keep reporting until they notice the cancel
+        if self.dep_loader.cancel_event.is_set():
+            return
+
+        if self.dep_progress is None:
+            self.dep_progress = QProgressDialog("Downloading required tools...", "Cancel", 0, 0, self)
+            self.dep_progress.setWindowTitle(APP_NAME)
+            self.dep_progress.canceled.connect(self.cancel_dependency_check)
+            # Totals grow as downloads start, so done == total is not the end;
+            # the dialog is closed in on_dependencies_ready
+            self.dep_progress.setAutoReset(False)
+            self.dep_progress.setAutoClose(False)
+            # Controls are already disabled, and a non-modal dialog keeps
+            # setValue from spinning the event loop inside this slot
+            self.dep_progress.setMinimumDuration(0)
+            self.dep_progress.show()
+
+        self.dep_progress.setMaximum(total)
+        self.dep_progress.setValue(done)
+
+    def cancel_dependency_check(self):
+        """Stop installing tools when the progress dialog is cancelled"""
+        self.dep_loader.cancel()
+        self.device_status.setText("Cancelling tool installation...")
+
+    def show_dependency_error(self, message):
+        """Report a tool that could not be installed"""
+        QMessageBox.critical(self, "Dependency Error", message)
+
+    def on_dependencies_ready(self, dep_manager):
+        """Finish startup once all tools are installed"""
+        if self.dep_progress is not None:
+            self.dep_progress.close()
+            self.dep_progress = None
+
+        self.dep_manager = dep_manager
+        self.device_mgr = DeviceManager(self.dep_manager)
+        self.device_status.setText("No device connected")
+        self.setup_signals()
+        self.set_controls_enabled(True)
+
         # Start device monitoring
         self.start_device_monitoring()
 
+    def on_dependency_check_finished(self):
+        """Leave the UI disabled if the tools could not be set up"""
+        if self.dep_manager is None:
+            if self.dep_progress is not None:
+                self.dep_progress.close()
+                self.dep_progress = None
+            if self.dep_loader.cancel_event.is_set():
+                self.device_status.setText("Tool installation cancelled")
+            else:
+                self.device_status.setText("Required tools unavailable")
+
+    def set_controls_enabled(self, enabled):
+        """Enable or disable controls that need the device tools"""
+        for btn in self.nav_buttons:
+            btn.setEnabled(enabled)
+        self.refresh_btn.setEnabled(enabled)
+        self.tab_widget.setEnabled(enabled)
+
     def setup_ui(self):
         """Initialize main window UI"""
         self.setWindowTitle(f"{APP_NAME} v{VERSION}")
@@ -267,6 +1136,9 @@ class iDeviceManager(QMainWindow):
         
         QApplication.setPalette(dark_palette)
 
+        # One shared stylesheet instead of a separately parsed one per widget
+        QApplication.instance().setStyleSheet(APP_STYLESHEET)
+
     def setup_signals(self):
         """Connect signals to slots"""
         self.device_mgr.signals.log_signal.connect(self.log_message)
@@ -276,79 +1148,51 @@ class iDeviceManager(QMainWindow):
     def create_sidebar(self, parent_layout):
         """Create the sidebar navigation"""
         sidebar = QWidget()
-        sidebar.setStyleSheet("""
-            background-color: #2c3e50;
-            color: white;
-            padding: 10px;
-        """)
+        sidebar.setObjectName("sidebar")
+        sidebar.setAttribute(Qt.WA_StyledBackground, True)
         sidebar_layout = QVBoxLayout()
         sidebar.setLayout(sidebar_layout)
         
         # Logo
         logo = QLabel(APP_NAME)
-        logo.setStyleSheet("""
-            font-size: 18px;
-            font-weight: bold;
-            padding: 20px;
-            qproperty-alignment: AlignCenter;
-        """)
+        logo.setObjectName("logo")
         sidebar_layout.addWidget(logo)
         
         # Version label
         version_label = QLabel(f"v{VERSION}")
-        version_label.setStyleSheet("""
-            font-size: 12px;
-            qproperty-alignment: AlignCenter;
-            padding-bottom: 20px;
-        """)
+        version_label.setObjectName("versionLabel")
         sidebar_layout.addWidget(version_label)
         
         # Device status
         self.device_status = QLabel("No device connected")
         self.device_status.setAlignment(Qt.AlignCenter)
-        self.device_status.setStyleSheet("""
-            font-size: 14px;
-            padding-bottom: 20px;
-        """)
+        self.device_status.setObjectName("deviceStatus")
         sidebar_layout.addWidget(self.device_status)
         
         # Navigation buttons
-        nav_buttons = [
-            ("Dashboard", "home", self.show_dashboard),
-            ("Flash & JB", "bolt", self.show_flash_jb),
-            ("Apps", "th-large", self.show_apps),
-            ("Files", "folder", self.show_files),
-            ("Backup", "save", self.show_backup),
-            ("Toolbox", "wrench", self.show_toolbox),
-            ("Settings", "cog", self.show_settings)
-        ]
-        
-        for text, icon_name, handler in nav_buttons:
+        self.nav_buttons = []
+        for text, icon_name, handler_name in self._NAV:
             btn = QPushButton(text)
-            try:
-                btn.setIcon(QIcon.fromTheme(icon_name))
-            except:
-                # Fallback icon
-                btn.setIcon(QIcon("icons/app.png"))
-                
-            btn.setStyleSheet("""
-                QPushButton {
-                    text-align: left;
-                    padding: 12px;
-                    border: none;
-                    color: white;
-                    font-size: 14px;
-                }
-                QPushButton:hover {
-                    background-color: #3498db;
-                }
-            """)
-            btn.clicked.connect(handler)
+            btn.setIcon(self._nav_icon(icon_name))
+            btn.setObjectName("navBtn")
+            btn.clicked.connect(getattr(self, handler_name))
             sidebar_layout.addWidget(btn)
+            self.nav_buttons.append(btn)
         
         sidebar_layout.addStretch()
         parent_layout.addWidget(sidebar, stretch=1)
 
+    @classmethod
+    def _nav_icon(cls, icon_name):
+        """Return a theme icon, falling back to the app icon, cached by name"""
+        icon = cls._icon_cache.get(icon_name)
+        if icon is None:
+            icon = QIcon.fromTheme(icon_name)
+            if icon.isNull():
+                icon = QIcon("icons/app.png")
+            cls._icon_cache[icon_name] = icon
+        return icon
+
     def create_content_area(self, parent_layout):
         """Create the main content area"""
         content = QWidget()
@@ -361,7 +1205,7 @@ class iDeviceManager(QMainWindow):
         status_bar.setLayout(status_layout)
         
         self.device_name_label = QLabel("No device connected")
-        self.device_name_label.setStyleSheet("font-weight: bold;")
+        self.device_name_label.setObjectName("deviceName")
         
         self.device_model_label = QLabel()
         self.ios_version_label = QLabel()
@@ -373,9 +1217,9 @@ class iDeviceManager(QMainWindow):
         status_layout.addWidget(self.battery_label)
         status_layout.addStretch()
         
-        refresh_btn = QPushButton("Refresh")
-        refresh_btn.clicked.connect(self.refresh_device)
-        status_layout.addWidget(refresh_btn)
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(self.refresh_device)
+        status_layout.addWidget(self.refresh_btn)
         
         content_layout.addWidget(status_bar)
         
@@ -383,28 +1227,51 @@ class iDeviceManager(QMainWindow):
         self.tab_widget = QTabWidget()
         self.tab_widget.setTabPosition(QTabWidget.North)
         
-        # Create tabs
-        self.create_dashboard_tab()
-        self.create_flash_jb_tab()
-        self.create_apps_tab()
-        self.create_files_tab()
-        self.create_backup_tab()
-        self.create_toolbox_tab()
-        self.create_settings_tab()
+        # Create tabs, building each one the first time it is shown
+        self._tab_builders = {
+            "Dashboard": self.create_dashboard_tab,
+            "Flash & JB": self.create_flash_jb_tab,
+            "Apps": self.create_apps_tab,
+            "Files": self.create_files_tab,
+            "Backup": self.create_backup_tab,
+            "Toolbox": self.create_toolbox_tab,
+            "Settings": self.create_settings_tab
+        }
+        for name in self._tab_builders:
+            placeholder = QWidget()
+            placeholder_layout = QVBoxLayout()
+            placeholder_layout.setContentsMargins(0, 0, 0, 0)
+            placeholder.setLayout(placeholder_layout)
+            self.tab_widget.addTab(placeholder, name)
+        self.tab_widget.currentChanged.connect(self._ensure_tab_built)
+        self._ensure_tab_built(self.tab_widget.currentIndex())
         
         content_layout.addWidget(self.tab_widget)
         
         # Log output
         self.log_output = QTextEdit()
         self.log_output.setReadOnly(True)
-        self.log_output.setStyleSheet("""
-            background-color: #1a202c;
-            color: #cbd5e0;
-            font-family: Consolas;
-            font-size: 12px;
-            border: 1px solid #2d3748;
-        """)
+        self.log_output.setObjectName("logOutput")
+        self.log_output.document().setMaximumBlockCount(LOG_MAX_BLOCKS)
         content_layout.addWidget(self.log_output, stretch=1)
+
+        # Log lines are buffered and flushed together to limit relayouts
+        self._log_buf = []
+        self._log_second = None
+        self._log_timestamp = ""
+        self._log_fmts = {}
+        for level, color in LOG_COLORS.items():
+            self._log_fmts[level] = QTextCharFormat()
+            self._log_fmts[level].setForeground(QColor(color))
+        self._level_fmt = QTextCharFormat()
+        self._level_fmt.setForeground(QColor("white"))
+        self._timestamp_fmt = QTextCharFormat()
+        self._timestamp_fmt.setForeground(QColor(LOG_TIMESTAMP_COLOR))
+        self._plain_fmt = QTextCharFormat()
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(LOG_FLUSH_INTERVAL)
+        self._log_timer.timeout.connect(self._flush_log)
         
         parent_layout.addWidget(content, stretch=4)
 
@@ -461,7 +1328,7 @@ class iDeviceManager(QMainWindow):
         layout.addWidget(status_group)
         layout.addStretch()
         
-        self.tab_widget.addTab(tab, "Dashboard")
+        return tab
 
     def create_flash_jb_tab(self):
         """Create Flash & Jailbreak tab"""
@@ -505,7 +1372,13 @@ class iDeviceManager(QMainWindow):
         layout.addWidget(jb_group)
         layout.addStretch()
         
-        self.tab_widget.addTab(tab, "Flash & JB")
+        return tab
+
+    def _ensure_tab_built(self, index):
+        """Build a tab's contents into its placeholder on first display"""
+        builder = self._tab_builders.pop(self.tab_widget.tabText(index), None)
+        if builder:
+            self.tab_widget.widget(index).layout().addWidget(builder())
 
     def populate_firmware_list(self):
         """Populate firmware list (simulated)"""
@@ -544,12 +1417,18 @@ class iDeviceManager(QMainWindow):
         self.tab_widget.setEnabled(False)
         
         # Start flash in background thread
-        self.flash_thread = threading.Thread(
-            target=self.run_flash,
-            args=(firmware,),
-            daemon=True
+        self.start_task(
+            self.run_flash, firmware,
+            on_finished=lambda result: self.tab_widget.setEnabled(True)
         )
-        self.flash_thread.start()
+
+    def start_task(self, fn, *args, on_finished=None):
+        """Run fn on the thread pool, logging any exception it raises"""
+        task = Task(fn, *args)
+        task.signals.log_signal.connect(self.log_message)
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        self.thread_pool.start(task)
 
     def run_flash(self, firmware):
         """Simulate firmware flashing"""
@@ -566,14 +1445,11 @@ class iDeviceManager(QMainWindow):
             for progress, message in steps:
                 time.sleep(1)
                 self.device_mgr.signals.progress_signal.emit(progress)
-                self.log_message(message, "info")
+                self.device_mgr.signals.log_signal.emit(message, "info")
                 
-            self.log_message(f"{firmware} flashed successfully!", "success")
+            self.device_mgr.signals.log_signal.emit(f"{firmware} flashed successfully!", "success")
         except Exception as e:
-            self.log_message(f"Flash failed: {str(e)}", "error")
-        finally:
-            # Re-enable UI
-            self.tab_widget.setEnabled(True)
+            self.device_mgr.signals.log_signal.emit(f"Flash failed: {str(e)}", "error")
 
     def start_jailbreak(self):
         """Start jailbreak process"""
@@ -602,12 +1478,10 @@ class iDeviceManager(QMainWindow):
         self.tab_widget.setEnabled(False)
         
         # Start jailbreak in background thread
-        self.jb_thread = threading.Thread(
-            target=self.run_jailbreak,
-            args=(tool,),
-            daemon=True
+        self.start_task(
+            self.run_jailbreak, tool,
+            on_finished=lambda result: self.tab_widget.setEnabled(True)
         )
-        self.jb_thread.start()
 
     def run_jailbreak(self, tool):
         """Simulate jailbreak process"""
@@ -623,27 +1497,80 @@ class iDeviceManager(QMainWindow):
             for progress, message in steps:
                 time.sleep(1)
                 self.device_mgr.signals.progress_signal.emit(progress)
-                self.log_message(message, "info")
+                self.device_mgr.signals.log_signal.emit(message, "info")
                 
-            self.log_message(f"{tool} jailbreak successful!", "success")
+            self.device_mgr.signals.log_signal.emit(f"{tool} jailbreak successful!", "success")
         except Exception as e:
-            self.log_message(f"Jailbreak failed: {str(e)}", "error")
-        finally:
-            # Re-enable UI
-            self.tab_widget.setEnabled(True)
+            self.device_mgr.signals.log_signal.emit(f"Jailbreak failed: {str(e)}", "error")
 
     # [Additional tab creation methods...]
     # create_apps_tab(), create_files_tab(), create_backup_tab(), etc.
 
     def start_device_monitoring(self):
-        """Start periodic device monitoring"""
+        """Start event-driven device monitoring"""
+        # Polling is only a fallback for when usbmuxd cannot be reached
         self.device_timer = QTimer(self)
+        self.device_timer.setTimerType(Qt.VeryCoarseTimer)
         self.device_timer.timeout.connect(self.refresh_device)
-        self.device_timer.start(3000)  # Check every 3 seconds
+        self._miss_count = 0
+
+        # usbmuxd only reports attach and detach, so re-read a connected
+        # device now and then to keep its battery level current
+        self.battery_timer = QTimer(self)
+        self.battery_timer.setTimerType(Qt.VeryCoarseTimer)
+        self.battery_timer.setInterval(BATTERY_REFRESH_INTERVAL)
+        self.battery_timer.timeout.connect(self.refresh_device)
+        self._attach_retries = None
+
+        self.usbmux_listener = UsbmuxListener(self)
+        self.usbmux_listener.device_event.connect(self.on_device_event)
+        self.usbmux_listener.unavailable.connect(self.start_device_polling)
+        self.usbmux_listener.start()
+
+        self.refresh_device()
+
+    def start_device_polling(self):
+        """Fall back to periodic device polling"""
+        self.log_message("usbmuxd unavailable, polling for devices", "warning")
+        self.battery_timer.stop()
+        self.device_timer.start(DEVICE_POLL_INTERVAL)
+
+    def on_device_event(self, event):
+        """Refresh device info after an attach, detach or pairing"""
+        self.device_mgr.invalidate_cache()
+        # Queries fail until a newly attached device is trusted, so retry
+        # a few times rather than showing it as disconnected
+        self._attach_retries = None if event == 'Detached' else 0
+        self.refresh_device()
 
     def refresh_device(self):
         """Refresh device connection status"""
-        self.device_mgr.check_connection()
+        # Only one check at a time; re-run once it finishes if asked again
+        if self._refresh_running:
+            self._refresh_pending = True
+            return
+
+        self._refresh_running = True
+        self.start_task(self.device_mgr.check_connection, on_finished=self.on_refresh_finished)
+
+    def on_refresh_finished(self, connected):
+        """Start a queued refresh, or schedule the next one"""
+        self._refresh_running = False
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh_device()
+            return
+
+        if connected:
+            self._attach_retries = None
+            if not self.device_timer.isActive() and not self.battery_timer.isActive():
+                self.battery_timer.start()
+            return
+
+        self.battery_timer.stop()
+        if self._attach_retries is not None and self._attach_retries < ATTACH_RETRIES:
+            QTimer.singleShot(ATTACH_RETRY_DELAY * 2 ** self._attach_retries, self.refresh_device)
+            self._attach_retries += 1
 
     def update_device_info(self, device_info):
         """Update UI with device information"""
@@ -682,6 +1609,10 @@ class iDeviceManager(QMainWindow):
             self.device_status.setStyleSheet("color: #2ecc71;")
             
             self.log_message(f"Connected: {name} ({model})", "success")
+
+            # Poll at full rate again while a device is attached
+            self._miss_count = 0
+            self.device_timer.setInterval(DEVICE_POLL_INTERVAL)
         else:
             self.device_name_label.setText("No device connected")
             self.device_model_label.setText("")
@@ -694,6 +1625,12 @@ class iDeviceManager(QMainWindow):
             
             self.log_message("Device disconnected", "warning")
 
+            # Back off polling while nothing is connected
+            self._miss_count += 1
+            self.device_timer.setInterval(
+                min(MAX_DEVICE_POLL_INTERVAL, DEVICE_POLL_INTERVAL * 2 ** self._miss_count)
+            )
+
     def update_progress(self, value):
         """Update progress bars"""
         self.flash_progress.setValue(value)
@@ -701,25 +1638,32 @@ class iDeviceManager(QMainWindow):
 
     def log_message(self, message, level="info"):
         """Add message to log with colored formatting"""
-        colors = {
-            "info": "#63b3ed",
-            "success": "#68d391",
-            "warning": "#faf089",
-            "error": "#fc8181"
-        }
-        
-        color = colors.get(level, "white")
-        timestamp = time.strftime("%H:%M:%S")
-        
-        html = f"""
-        <div style="margin-bottom: 5px;">
-            <span style="color: #718096;">[{timestamp}]</span>
-            <span style="color: {color};">{level.upper()}:</span>
-            <span>{message}</span>
-        </div>
-        """
-        
-        self.log_output.insertHtml(html)
+        # Timestamps only change once a second, so format them once
+        now = int(time.time())
+        if now != self._log_second:
+            self._log_second = now
+            self._log_timestamp = time.strftime("%H:%M:%S", time.localtime(now))
+
+        self._log_buf.append((self._log_timestamp, level, message))
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+
+    def _flush_log(self):
+        """Append buffered log lines in a single edit"""
+        if not self._log_buf:
+            return
+
+        cursor = self.log_output.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for timestamp, level, message in self._log_buf:
+            cursor.insertText(f"[{timestamp}] ", self._timestamp_fmt)
+            cursor.insertText(f"{level.upper()}: ", self._log_fmts.get(level, self._level_fmt))
+            cursor.insertText(f"{message}\n", self._plain_fmt)
+        cursor.endEditBlock()
+        self._log_buf.clear()
+
+        self.log_output.setTextCursor(cursor)
         self.log_output.ensureCursorVisible()
 
     # [Additional methods for other functionality...]
@@ -727,13 +1671,24 @@ class iDeviceManager(QMainWindow):
 
     def closeEvent(self, event):
         """Handle application close"""
+        # Destroying the loader thread while it runs would crash, so stop
+        # the installation and wait for the current chunk or request to end
+        if self.dep_loader.isRunning():
+            self.dep_loader.dep_ready.disconnect()
+            self.dep_loader.cancel()
+            self.dep_loader.wait()
+
         # Clean up any mounted filesystems
-        if hasattr(self, 'device_mgr'):
-            self.device_mgr.unmount_device()
+        if self.device_mgr:
+            if self.device_mgr.mounted:
+                self.device_mgr.unmount_device()
         
         # Stop device monitoring
+        if hasattr(self, 'usbmux_listener'):
+            self.usbmux_listener.stop()
         if hasattr(self, 'device_timer'):
             self.device_timer.stop()
+            self.battery_timer.stop()
         
         event.accept()
 